@@ -7,50 +7,72 @@ Part of M3L-66/M3L-67 expansion.
 
 API Endpoints:
     POST /generate - Generate QR code image from metadata
+    POST /generate/config - Generate QR code image from device configuration
+    POST /cache/clear - Drop the handling worker's cached QR code images
 
 Usage:
     uvicorn api:app --host 0.0.0.0 --port 8000
 
+    Production (one worker per core, app preloaded before fork):
+    WEB_CONCURRENCY=$(nproc) gunicorn -k uvicorn_worker.UvicornWorker --preload -b 0.0.0.0:8000 api:app
+
     Or with Docker:
     docker build -t qr-generator-api .
     docker run -p 8000:8000 qr-generator-api
 """
 
-import io
-import json
-from typing import List, Optional
+import asyncio
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import contextlib
+import functools
+import os
+from typing import Annotated, List, Optional
 
+import cachetools
 from fastapi import FastAPI, HTTPException, Response
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field, field_validator
-import qrcode
+import orjson
+from pydantic import BaseModel, Field, StringConstraints
+import segno
 
 # Import validation and generation logic from existing CLI tool
 from generate_qr import (
+    DEVICE_ID_MAX_LEN,
+    DNS_HOST_PATTERN,
+    MQTT_HOST_MAX_LEN,
+    MQTT_PASSWORD_MAX_LEN,
+    MQTT_USERNAME_MAX_LEN,
+    QR_MAX_PAYLOAD_BYTES,
+    TEST_ID_PATTERN,
+    WIFI_PASSWORD_MAX_LEN,
+    WIFI_SSID_MAX_LEN,
     generate_short_uuid,
-    validate_test_id,
-    validate_description,
-    validate_labels,
-    validate_wifi_ssid,
-    validate_wifi_password,
-    validate_mqtt_host,
-    validate_mqtt_port
+    matrix_to_png,
+    warm_up_png_layouts
 )
 
 
+# Field types (mirror the generate_qr validators). Constraints declared this
+# way are checked inside pydantic-core rather than by Python callbacks.
+TestId = Annotated[str, StringConstraints(pattern=TEST_ID_PATTERN)]
+Description = Annotated[str, StringConstraints(min_length=1, max_length=64)]
+Label = Annotated[str, StringConstraints(min_length=1, max_length=32)]
+PrintableAscii = Annotated[str, StringConstraints(pattern=r'^[\x20-\x7E]*$')]
+# Dotted IPv4 addresses also satisfy the DNS pattern
+MqttHost = Annotated[str, StringConstraints(pattern=DNS_HOST_PATTERN)]
+
+
 # Pydantic models for request/response validation
 class QRGenerateRequest(BaseModel):
     """Request model for QR code generation."""
 
-    description: str = Field(
+    description: Description = Field(
         ...,
-        min_length=1,
-        max_length=64,
         description="Human-readable test description (1-64 characters)",
         examples=["walking_outdoor"]
     )
 
-    labels: List[str] = Field(
+    labels: List[Label] = Field(
         ...,
         min_length=1,
         max_length=10,
@@ -58,26 +80,17 @@ class QRGenerateRequest(BaseModel):
         examples=[["walking", "outdoor"]]
     )
 
-    test_id: Optional[str] = Field(
+    test_id: Optional[TestId] = Field(
         None,
         description="Optional 8-character alphanumeric test ID (auto-generated if not provided)",
         examples=["A3F9K2M7"]
     )
 
-    @field_validator('labels')
-    @classmethod
-    def validate_labels_list(cls, v):
-        """Validate each label in the list."""
-        valid, error = validate_labels(v)
-        if not valid:
-            raise ValueError(error)
-        return v
-
 
 class ConfigQRRequest(BaseModel):
     """Request model for device configuration QR code generation."""
 
-    wifi_ssid: str = Field(
+    wifi_ssid: PrintableAscii = Field(
         ...,
         min_length=1,
         max_length=16,
@@ -85,7 +98,7 @@ class ConfigQRRequest(BaseModel):
         examples=["HomeNetwork"]
     )
 
-    wifi_password: str = Field(
+    wifi_password: PrintableAscii = Field(
         ...,
         min_length=8,
         max_length=16,
@@ -93,7 +106,7 @@ class ConfigQRRequest(BaseModel):
         examples=["SecurePass123"]
     )
 
-    mqtt_host: str = Field(
+    mqtt_host: MqttHost = Field(
         ...,
         min_length=1,
         max_length=40,
@@ -128,45 +141,205 @@ class ConfigQRRequest(BaseModel):
         examples=["m3log_001"]
     )
 
-    @field_validator('wifi_ssid')
-    @classmethod
-    def validate_ssid(cls, v: str) -> str:
-        """Validate WiFi SSID format."""
-        from generate_qr import validate_wifi_ssid
-        valid, error = validate_wifi_ssid(v)
-        if not valid:
-            raise ValueError(error)
-        return v
-
-    @field_validator('wifi_password')
-    @classmethod
-    def validate_password(cls, v: str) -> str:
-        """Validate WiFi password strength."""
-        from generate_qr import validate_wifi_password
-        valid, error = validate_wifi_password(v)
-        if not valid:
-            raise ValueError(error)
-        return v
-
-    @field_validator('mqtt_host')
-    @classmethod
-    def validate_host(cls, v: str) -> str:
-        """Validate MQTT broker host format."""
-        from generate_qr import validate_mqtt_host
-        valid, error = validate_mqtt_host(v)
-        if not valid:
-            raise ValueError(error)
-        return v
+
+def _render_png(json_bytes: bytes) -> bytes:
+    """
+    Render a QR code PNG for the given compact JSON payload.
+
+    Runs in the render pool's worker processes.
+
+    Args:
+        json_bytes: Compact UTF-8 JSON payload to encode
+
+    Returns:
+        PNG image bytes
+    """
+    # Smallest regular QR symbol at error correction level L. Micro QR and
+    # automatic error-level boosting are disabled to match what the
+    # Tiny Code Reader expects.
+    qr = segno.make(json_bytes, error='L', micro=False, boost_error=False)
+    return matrix_to_png(qr.matrix)
+
+
+def _warm_up() -> None:
+    """
+    Build the render-path state once at import time.
+
+    Precomputes the PNG layout for every regular QR version (1-40) and runs
+    one segno encode. Config payloads stay within version 10
+    (QR_MAX_PAYLOAD_BYTES), but /generate has no byte cap: a max-length
+    ASCII metadata payload (464 B) needs version 15 and multi-byte UTF-8
+    text goes well beyond, so all versions are covered; the layouts take
+    a few hundred KB in total. Under `gunicorn --preload` this happens in the master
+    before the workers fork, so the warmed-up pages are shared
+    copy-on-write by every worker and the render pool processes forked
+    from them. A lifespan/startup hook would run after the fork, in each
+    worker separately.
+    """
+    warm_up_png_layouts(range(1, 41))
+    _render_png(orjson.dumps({"test_id": "WARMUP00", "description": "x", "labels": ["x"]}))
+
+
+_warm_up()
+
+
+# Rendered PNGs keyed by the request fields that determine the payload, so
+# repeated requests skip JSON building, the render pool and QR encoding.
+# Keys are compared exactly (no digest), so a hit can never serve another
+# payload's image. The cache lives in each server worker process; workers
+# do not share or invalidate each other's entries.
+PNG_CACHE_SIZE = 2048
+_png_cache = cachetools.LRUCache(maxsize=PNG_CACHE_SIZE)
+
+# How long the batcher waits for more queued renders before dispatching
+RENDER_BATCH_WINDOW_S = 0.002
+
+# Upper bound on how long a request waits for its render (normally a few ms)
+RENDER_TIMEOUT_S = 10.0
+
+
+def _render_pool_size() -> int:
+    """
+    Number of render processes for this server worker.
+
+    RENDER_POOL_SIZE sets it explicitly. Otherwise the cores are shared
+    evenly among the WEB_CONCURRENCY server workers (gunicorn and uvicorn
+    read the same variable for their worker count), so N workers on N
+    cores get one render process each instead of N apiece.
+    """
+    if os.environ.get("RENDER_POOL_SIZE"):
+        return max(1, int(os.environ["RENDER_POOL_SIZE"]))
+    workers = int(os.environ.get("WEB_CONCURRENCY") or 1)
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+RENDER_POOL_SIZE = _render_pool_size()
+
+
+def _new_render_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Create the process pool that runs QR rendering off the event loop."""
+    return concurrent.futures.ProcessPoolExecutor(max_workers=RENDER_POOL_SIZE)
+
+
+def _render_png_batch(payloads: List[bytes]) -> List[bytes]:
+    """Render several payloads in a single worker round trip."""
+    return [_render_png(json_bytes) for json_bytes in payloads]
+
+
+def _fail_waiters(waiters, error: BaseException) -> None:
+    """Fail every still-pending request future in waiters with error."""
+    for futures in waiters:
+        for fut in futures:
+            if not fut.done():
+                fut.set_exception(error)
+
+
+def _submit_batch(loop, chunk: List[bytes]) -> asyncio.Future:
+    """
+    Submit one chunk to the render pool, replacing the pool if it is broken.
+
+    A render process that dies (OOM kill, crash) leaves the executor
+    permanently broken and every later submit raises BrokenProcessPool.
+    The pool is swapped for a fresh one and the chunk resubmitted once, so
+    the service recovers instead of failing every request from then on.
+    """
+    try:
+        return loop.run_in_executor(app.state.pool, _render_png_batch, chunk)
+    except BrokenProcessPool:
+        app.state.pool.shutdown(wait=False)
+        app.state.pool = _new_render_pool()
+        return loop.run_in_executor(app.state.pool, _render_png_batch, chunk)
+
+
+def _resolve_batch(waiters, batch_future) -> None:
+    """Hand the results of a finished batch back to the waiting requests."""
+    cancelled = batch_future.cancelled()
+    error = None if cancelled else batch_future.exception()
+    results = batch_future.result() if not (cancelled or error) else [None] * len(waiters)
+    for futures, png in zip(waiters, results):
+        for fut in futures:
+            if fut.done():  # Client went away
+                continue
+            if cancelled:
+                fut.cancel()
+            elif error:
+                fut.set_exception(error)
+            else:
+                fut.set_result(png)
+
+
+async def _render_batcher(queue: asyncio.Queue) -> None:
+    """
+    Coalesce queued render requests and dispatch them to the pool in batches.
+
+    Requests arriving within RENDER_BATCH_WINDOW_S of each other are
+    de-duplicated and split into at most one chunk per pool process, so a
+    burst costs a handful of inter-process round trips instead of one per
+    request while still using every process in the pool.
+    """
+    loop = asyncio.get_running_loop()
+    chunks = RENDER_POOL_SIZE
+    while True:
+        items = [await queue.get()]
+        await asyncio.sleep(RENDER_BATCH_WINDOW_S)
+        while not queue.empty():
+            items.append(queue.get_nowait())
+
+        # Identical payloads in a burst are rendered once
+        waiters = {}
+        for json_bytes, fut in items:
+            waiters.setdefault(json_bytes, []).append(fut)
+        payloads = list(waiters)
+
+        for i in range(min(chunks, len(payloads))):
+            chunk = payloads[i::chunks]
+            chunk_waiters = [waiters[json_bytes] for json_bytes in chunk]
+            try:
+                batch_future = _submit_batch(loop, chunk)
+            except Exception as e:
+                # Never let a dispatch error kill the batcher: fail this
+                # chunk's requests (500) and keep serving later ones
+                _fail_waiters(chunk_waiters, e)
+                continue
+            batch_future.add_done_callback(functools.partial(_resolve_batch, chunk_waiters))
+
+
+async def _render_png_batched(json_bytes: bytes) -> bytes:
+    """Queue a payload for batched rendering and wait for its PNG."""
+    if app.state.batcher.done():
+        raise RuntimeError("render batcher is not running")
+    fut = asyncio.get_running_loop().create_future()
+    await app.state.queue.put((json_bytes, fut))
+    try:
+        return await asyncio.wait_for(fut, RENDER_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        raise RuntimeError(f"render timed out after {RENDER_TIMEOUT_S:g}s") from None
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the render pool and batcher with the app and stop them on exit."""
+    app.state.pool = _new_render_pool()
+    app.state.queue = asyncio.Queue()
+    app.state.batcher = asyncio.create_task(_render_batcher(app.state.queue))
+    yield
+    app.state.batcher.cancel()
+    app.state.pool.shutdown()
 
 
 # Initialize FastAPI app
 app = FastAPI(
     title="M3 Data Logger QR Code Generator API",
     description="REST API for generating QR codes with test metadata for M3 Data Logger",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 
+# OpenAPI description for the image endpoints (PNG bytes, not JSON)
+PNG_RESPONSES = {200: {"content": {"image/png": {}}, "description": "QR code PNG image"}}
+
+
 @app.get("/")
 async def root():
     """
@@ -181,6 +354,7 @@ async def root():
         "endpoints": {
             "POST /generate": "Generate QR code from test metadata",
             "POST /generate/config": "Generate QR code from device configuration",
+            "POST /cache/clear": "Drop this worker's cached QR code images",
             "GET /health": "Health check endpoint"
         }
     }
@@ -197,7 +371,7 @@ async def health_check():
     return {"status": "healthy"}
 
 
-@app.post("/generate", response_class=StreamingResponse)
+@app.post("/generate", response_class=Response, responses=PNG_RESPONSES)
 async def generate_qr(request: QRGenerateRequest):
     """
     Generate QR code image from test metadata.
@@ -209,10 +383,11 @@ async def generate_qr(request: QRGenerateRequest):
         request: QRGenerateRequest object with metadata
 
     Returns:
-        StreamingResponse containing PNG image bytes
+        Response containing PNG image bytes
 
     Raises:
-        HTTPException: If validation fails or QR generation errors occur
+        HTTPException: If QR generation errors occur (invalid fields are
+            rejected with 422 by the request model)
 
     Example:
         ```bash
@@ -223,55 +398,39 @@ async def generate_qr(request: QRGenerateRequest):
         ```
     """
     try:
-        # Generate or validate test_id
-        if request.test_id:
-            valid, error = validate_test_id(request.test_id)
-            if not valid:
-                raise HTTPException(status_code=400, detail=f"Invalid test_id: {error}")
-            test_id = request.test_id
-        else:
-            test_id = generate_short_uuid()
-
-        # Validate description (Pydantic handles min/max length, but we use custom validator)
-        valid, error = validate_description(request.description)
-        if not valid:
-            raise HTTPException(status_code=400, detail=f"Invalid description: {error}")
-
-        # Build metadata JSON
-        metadata = {
-            "test_id": test_id,
-            "description": request.description,
-            "labels": request.labels
-        }
+        # Fields are validated by the request model; only test_id may need generating
+        test_id = request.test_id or generate_short_uuid()
 
-        json_str = json.dumps(metadata, separators=(',', ':'))  # Compact JSON
-
-        # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,  # Auto-fit
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(json_str)
-        qr.make(fit=True)
+        # A freshly generated test_id can never be requested again, so only
+        # caller-supplied IDs are cached (auto-ID images would just evict)
+        cache_key = None
+        png = None
+        if request.test_id:
+            cache_key = ("metadata", test_id, request.description, tuple(request.labels))
+            png = _png_cache.get(cache_key)
+        if png is None:
+            # Build metadata JSON
+            metadata = {
+                "test_id": test_id,
+                "description": request.description,
+                "labels": request.labels
+            }
 
-        # Create PNG image in memory
-        img = qr.make_image(fill_color="black", back_color="white")
+            json_bytes = orjson.dumps(metadata)  # Compact UTF-8 JSON
 
-        # Save to BytesIO buffer
-        img_buffer = io.BytesIO()
-        img.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
+            # Generate QR code
+            png = await _render_png_batched(json_bytes)
+            if cache_key is not None:
+                _png_cache[cache_key] = png
 
-        # Return image as streaming response with custom header
+        # Return image with custom header
         headers = {
             "X-Test-ID": test_id,
             "Content-Disposition": f"inline; filename=qr_{test_id}.png"
         }
 
-        return StreamingResponse(
-            img_buffer,
+        return Response(
+            content=png,
             media_type="image/png",
             headers=headers
         )
@@ -282,7 +441,7 @@ async def generate_qr(request: QRGenerateRequest):
         raise HTTPException(status_code=500, detail=f"QR generation failed: {str(e)}")
 
 
-@app.post("/generate/config", response_class=StreamingResponse)
+@app.post("/generate/config", response_class=Response, responses=PNG_RESPONSES)
 async def generate_config_qr(request: ConfigQRRequest):
     """
     Generate device configuration QR code.
@@ -294,7 +453,7 @@ async def generate_config_qr(request: ConfigQRRequest):
         request: ConfigQRRequest object with device configuration
 
     Returns:
-        StreamingResponse containing PNG image bytes
+        Response containing PNG image bytes
 
     Raises:
         HTTPException: If validation fails or QR generation errors occur
@@ -316,77 +475,58 @@ async def generate_config_qr(request: ConfigQRRequest):
         ```
     """
     try:
-        # Build configuration JSON
-        config_data = {
-            "type": "device_config",
-            "version": "1.0",
-            "wifi": {
-                "ssid": request.wifi_ssid,
-                "password": request.wifi_password
-            },
-            "mqtt": {
-                "host": request.mqtt_host,
-                "port": request.mqtt_port,
-                "username": request.mqtt_username,
-                "password": request.mqtt_password,
-                "device_id": request.device_id
-            }
-        }
-
-        json_str = json.dumps(config_data, separators=(',', ':'))  # Compact JSON
-        json_size = len(json_str)
-
-        # Import constants from generate_qr
-        from generate_qr import (
-            QR_MAX_PAYLOAD_BYTES,
-            WIFI_SSID_MAX_LEN,
-            WIFI_PASSWORD_MAX_LEN,
-            MQTT_HOST_MAX_LEN,
-            MQTT_USERNAME_MAX_LEN,
-            MQTT_PASSWORD_MAX_LEN,
-            DEVICE_ID_MAX_LEN
+        cache_key = (
+            "config", request.wifi_ssid, request.wifi_password, request.mqtt_host,
+            request.mqtt_port, request.mqtt_username, request.mqtt_password, request.device_id
         )
+        png = _png_cache.get(cache_key)
+        if png is None:
+            # Build configuration JSON
+            config_data = {
+                "type": "device_config",
+                "version": "1.0",
+                "wifi": {
+                    "ssid": request.wifi_ssid,
+                    "password": request.wifi_password
+                },
+                "mqtt": {
+                    "host": request.mqtt_host,
+                    "port": request.mqtt_port,
+                    "username": request.mqtt_username,
+                    "password": request.mqtt_password,
+                    "device_id": request.device_id
+                }
+            }
 
-        # Check size (Tiny Code Reader limit)
-        if json_size > QR_MAX_PAYLOAD_BYTES:
-            error_details = (
-                f"Config JSON too large ({json_size} bytes, max {QR_MAX_PAYLOAD_BYTES}). "
-                f"Reduce field lengths: "
-                f"WiFi SSID: {len(request.wifi_ssid)}/{WIFI_SSID_MAX_LEN} chars, "
-                f"WiFi Password: {len(request.wifi_password)}/{WIFI_PASSWORD_MAX_LEN} chars, "
-                f"MQTT Host: {len(request.mqtt_host)}/{MQTT_HOST_MAX_LEN} chars, "
-                f"MQTT Username: {len(request.mqtt_username)}/{MQTT_USERNAME_MAX_LEN} chars, "
-                f"MQTT Password: {len(request.mqtt_password)}/{MQTT_PASSWORD_MAX_LEN} chars, "
-                f"Device ID: {len(request.device_id)}/{DEVICE_ID_MAX_LEN} chars"
-            )
-            raise HTTPException(status_code=400, detail=error_details)
-
-        # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,  # Auto-fit
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(json_str)
-        qr.make(fit=True)
-
-        # Create PNG image in memory
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        # Save to BytesIO buffer
-        img_buffer = io.BytesIO()
-        img.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
-
-        # Return image as streaming response with custom header
+            json_bytes = orjson.dumps(config_data)  # Compact UTF-8 JSON
+            json_size = len(json_bytes)
+
+            # Check size (Tiny Code Reader limit)
+            if json_size > QR_MAX_PAYLOAD_BYTES:
+                error_details = (
+                    f"Config JSON too large ({json_size} bytes, max {QR_MAX_PAYLOAD_BYTES}). "
+                    f"Reduce field lengths: "
+                    f"WiFi SSID: {len(request.wifi_ssid)}/{WIFI_SSID_MAX_LEN} chars, "
+                    f"WiFi Password: {len(request.wifi_password)}/{WIFI_PASSWORD_MAX_LEN} chars, "
+                    f"MQTT Host: {len(request.mqtt_host)}/{MQTT_HOST_MAX_LEN} chars, "
+                    f"MQTT Username: {len(request.mqtt_username)}/{MQTT_USERNAME_MAX_LEN} chars, "
+                    f"MQTT Password: {len(request.mqtt_password)}/{MQTT_PASSWORD_MAX_LEN} chars, "
+                    f"Device ID: {len(request.device_id)}/{DEVICE_ID_MAX_LEN} chars"
+                )
+                raise HTTPException(status_code=400, detail=error_details)
+
+            # Generate QR code
+            png = await _render_png_batched(json_bytes)
+            _png_cache[cache_key] = png
+
+        # Return image with custom header
         headers = {
             "X-Device-ID": request.device_id,
             "Content-Disposition": f"inline; filename=config_{request.device_id}.png"
         }
 
-        return StreamingResponse(
-            img_buffer,
+        return Response(
+            content=png,
             media_type="image/png",
             headers=headers
         )
@@ -397,6 +537,24 @@ async def generate_config_qr(request: ConfigQRRequest):
         raise HTTPException(status_code=500, detail=f"Config QR generation failed: {str(e)}")
 
 
+@app.post("/cache/clear")
+async def clear_cache():
+    """
+    Drop the cached QR code images of the worker handling this request.
+
+    The cache is per server worker process, so with several workers this
+    is best effort: only the worker that receives the request is cleared.
+    Cached images never go stale (keys are the full payload fields), so
+    this only frees memory.
+
+    Returns:
+        JSON object with the number of entries dropped and the worker's PID
+    """
+    cached = len(_png_cache)
+    _png_cache.clear()
+    return {"status": "cleared", "entries": cached, "worker": os.getpid()}
+
+
 # TODO: Future S3 integration endpoint (M3L-67)
 #
 # @app.post("/generate-and-upload")
@@ -415,4 +573,17 @@ async def generate_config_qr(request: ConfigQRRequest):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # One worker per core, uvloop + httptools, no per-request access log.
+    # Exported so each spawned worker sizes its render pool to a share of
+    # the cores (see _render_pool_size).
+    workers = int(os.environ.setdefault("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
@@ -18,23 +18,27 @@ Usage:
 """
 
 import argparse
+import functools
 import json
-import random
-import re
-import string
+import os
+import struct
 import sys
 
 try:
-    import qrcode
+    # zlib-ng: SIMD deflate and hardware CRC32 (PCLMULQDQ), same API as zlib
+    from zlib_ng import zlib_ng as zlib
 except ImportError:
-    print("Error: qrcode library not found. Install with: pip install qrcode[pil]")
-    sys.exit(1)
+    import zlib
 
 
 # QR Size Constraints (Tiny Code Reader hardware limit: 256 bytes)
 # JSON structure overhead ~147 bytes, leaving ~73 bytes for field data
 QR_MAX_PAYLOAD_BYTES = 220
 
+# Image geometry: 10px per module, 4-module quiet zone
+QR_BOX_SIZE = 10
+QR_BORDER = 4
+
 # Field length limits optimized for QR size (cannot max all fields simultaneously)
 # Realistic configs fit comfortably (see README for examples)
 WIFI_SSID_MAX_LEN = 16      # IEEE 802.11 allows 32, reduced for QR size
@@ -44,6 +48,28 @@ MQTT_USERNAME_MAX_LEN = 10  # Optional field
 MQTT_PASSWORD_MAX_LEN = 10  # Optional field
 DEVICE_ID_MAX_LEN = 10      # Reasonable identifier length
 
+# Test ID: exactly 8 ASCII letters/digits, as the firmware checks (any case).
+# Used by the API's pydantic model; validate_test_id checks the same rule with
+# string methods, and test_generate_qr.py keeps the two in agreement. The $ is
+# end of text in pydantic's Rust regex engine (which has no \Z); with Python's
+# re use fullmatch, as re.match's $ also matches before a trailing newline.
+TEST_ID_PATTERN = r'^[A-Za-z0-9]{8}$'
+
+# MQTT broker host format: DNS name (RFC 1123 labels); dotted IPv4 literals also match
+DNS_HOST_PATTERN = r'^[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*$'
+
+# Test ID alphabet: uppercase letters and digits minus the ambiguous 0, 1, I, O
+# (sorted(set(ascii_uppercase + digits) - set('01IOl')); 'l' never occurs, so L stays)
+_SUUID_ALPHABET = '23456789ABCDEFGHJKLMNPQRSTUVWXYZ'
+# Byte -> alphabet character. The alphabet has 32 entries, so repeating it 8
+# times covers all 256 byte values evenly and urandom bytes map without bias.
+_SUUID_TABLE = bytes.maketrans(bytes(range(256)), (_SUUID_ALPHABET * (256 // len(_SUUID_ALPHABET))).encode('ascii'))
+
+# C string encoder behind json.dumps (quotes + ASCII escapes). The payload
+# schemas are fixed, so filling them in directly gives the same bytes as
+# json.dumps(..., separators=(',', ':')) without walking a dict.
+_json_str = json.encoder.encode_basestring_ascii
+
 
 def generate_short_uuid(length=8):
     """
@@ -57,16 +83,14 @@ def generate_short_uuid(length=8):
     Returns:
         String of random alphanumeric characters (e.g., "A3F9K2M7")
     """
-    # Use uppercase letters and digits, excluding ambiguous characters
-    chars = ''.join(set(string.ascii_uppercase + string.digits) - set('01IOl'))
-    return ''.join(random.choice(chars) for _ in range(length))
+    return os.urandom(length).translate(_SUUID_TABLE).decode('ascii')
 
 
 def validate_test_id(test_id):
     """Validate test_id is exactly 8 alphanumeric characters."""
     if len(test_id) != 8:
         return False, "test_id must be exactly 8 characters"
-    if not test_id.isalnum():
+    if not (test_id.isascii() and test_id.isalnum()):
         return False, "test_id must be alphanumeric only"
     return True, ""
 
@@ -86,10 +110,14 @@ def validate_labels(labels):
         return False, "must provide at least 1 label"
     if len(labels) > 10:
         return False, "cannot exceed 10 labels"
-    for label in labels:
-        if len(label) == 0:
+    lengths = list(map(len, labels))
+    if min(lengths) > 0 and max(lengths) <= 32:
+        return True, ""
+    # Only walk the labels when one is bad, to name the first offender
+    for label, length in zip(labels, lengths):
+        if length == 0:
             return False, f"label '{label}' cannot be empty"
-        if len(label) > 32:
+        if length > 32:
             return False, f"label '{label}' exceeds 32 characters"
     return True, ""
 
@@ -100,7 +128,7 @@ def validate_wifi_ssid(ssid):
         return False, f"SSID must be 1-{WIFI_SSID_MAX_LEN} characters (IEEE 802.11 allows 32, reduced for QR size)"
 
     # IEEE 802.11 allows printable ASCII (0x20-0x7E)
-    if not all(0x20 <= ord(c) <= 0x7E for c in ssid):
+    if not (ssid.isascii() and ssid.isprintable()):
         return False, "SSID contains non-printable characters (use printable ASCII)"
 
     return True, ""
@@ -115,20 +143,28 @@ def validate_wifi_password(password):
         return False, "Password must be 8-16 characters (WPA2 requirement + QR size limit)"
 
     # WPA2 passphrase: printable ASCII only (0x20-0x7E)
-    if not all(0x20 <= ord(c) <= 0x7E for c in password):
+    if not (password.isascii() and password.isprintable()):
         return False, "Password must contain only printable ASCII characters (ASCII 32-126)"
 
     return True, ""
 
 
+def _valid_dns(host):
+    """Single-pass check of DNS_HOST_PATTERN: dot-separated 1-63 char labels of
+    ASCII letters, digits and hyphens, not starting or ending with a hyphen."""
+    if not host.isascii():
+        return False
+    for label in host.split('.'):
+        if not (0 < len(label) <= 63 and label[0] != '-' and label[-1] != '-'
+                and label.replace('-', '').isalnum()):
+            return False
+    return True
+
+
 def validate_mqtt_host(host):
     """Validate MQTT broker host (DNS or IP format)."""
-    # DNS pattern
-    dns_pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*$'
-    # IPv4 pattern
-    ipv4_pattern = r'^((25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
-
-    if re.match(dns_pattern, host) or re.match(ipv4_pattern, host):
+    # Dotted IPv4 literals are valid DNS-style labels, so one check covers both
+    if _valid_dns(host):
         return True, ""
     return False, "Invalid MQTT host format (must be DNS name or IPv4 address)"
 
@@ -147,7 +183,134 @@ def validate_device_id(device_id):
     return True, ""
 
 
-def generate_qr_code(test_id, description, labels, output_path=None, show=True):
+# Half-block glyph for a (top, bottom) module pair packed as top*2 + bottom
+# (1 = dark). Light modules are drawn as ink, matching segno's compact output.
+_TERMINAL_BLOCKS = str.maketrans({'\x00': '\u2588', '\x01': '\u2580', '\x02': '\u2584', '\x03': ' '})
+
+
+def _terminal_qr(matrix, border=QR_BORDER):
+    """Render a QR matrix as half-block text, two module rows per line.
+
+    Each pair of rows is packed with one big-int multiply-add (module values
+    are 0/1, so top*2 + bottom never carries between bytes) and mapped to
+    glyphs with str.translate, instead of looking up every module in Python.
+    """
+    width = len(matrix[0]) + 2 * border
+    quiet = bytes(border)
+    rows = [bytes(width)] * border
+    rows += [quiet + row + quiet for row in matrix]
+    rows += [bytes(width)] * border
+    if len(rows) % 2:
+        rows.append(b'\x01' * width)  # blank half below the last row
+    return '\n'.join(
+        (int.from_bytes(top, 'big') * 2 + int.from_bytes(bottom, 'big'))
+        .to_bytes(width, 'big').decode('latin-1').translate(_TERMINAL_BLOCKS)
+        for top, bottom in zip(rows[::2], rows[1::2])
+    )
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _png_chunk(tag, data):
+    """Build a PNG chunk (length, tag, data, CRC)."""
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+
+# Every image ends with the same empty IEND chunk
+_PNG_SUFFIX = _png_chunk(b'IEND', b'')
+
+
+@functools.lru_cache(maxsize=None)
+def _png_layout(modules, box_size, border):
+    """
+    Precompute the raster constants for one QR symbol size and geometry.
+
+    Only a few symbol versions ever occur for our payload sizes, so the
+    quiet-zone scanlines, module-to-bits table and row padding are built
+    once per (modules, box_size, border) instead of on every render. The
+    same goes for the PNG signature + IHDR prefix, which depends only on
+    the image dimensions.
+
+    Returns:
+        Tuple of (prefix, row_bytes, cells, quiet, padding, quiet_rows)
+    """
+    width = (modules + 2 * border) * box_size
+    row_bytes = (width + 7) // 8
+    cells = {0: '1' * box_size, 1: '0' * box_size}  # Greyscale bit 1 = white
+    quiet = '1' * (border * box_size)
+    padding = '1' * (row_bytes * 8 - width)
+    # Every scanline starts with filter type 0 (None)
+    quiet_rows = (b'\0' + b'\xff' * row_bytes) * (border * box_size)
+
+    # Width, height, bit depth 1, colour type 0 (greyscale), default methods
+    ihdr = struct.pack('>IIBBBBB', width, width, 1, 0, 0, 0, 0)
+    prefix = PNG_SIGNATURE + _png_chunk(b'IHDR', ihdr)
+    return prefix, row_bytes, cells, quiet, padding, quiet_rows
+
+
+def warm_up_png_layouts(versions, box_size=QR_BOX_SIZE, border=QR_BORDER):
+    """Precompute the PNG layouts for the given QR versions (see _png_layout)."""
+    for version in versions:
+        _png_layout(17 + 4 * version, box_size, border)
+
+
+def matrix_to_png(matrix, box_size=QR_BOX_SIZE, border=QR_BORDER):
+    """
+    Encode a QR module matrix as a 1-bit greyscale PNG.
+
+    Each module row is expanded to its pixel scanline with a single
+    str.translate (module -> box_size bits) and int(bits, 2) pack, then
+    repeated box_size times. No per-pixel Python work and no PIL image.
+
+    Args:
+        matrix: Rows of module values (1 = dark), e.g. segno's QRCode.matrix
+        box_size: Pixels per module
+        border: Quiet-zone width in modules
+
+    Returns:
+        PNG image bytes
+    """
+    prefix, row_bytes, cells, quiet, padding, quiet_rows = _png_layout(len(matrix), box_size, border)
+
+    scanlines = [quiet_rows]
+    for row in matrix:
+        bits = quiet + bytes(row).decode('latin-1').translate(cells) + quiet + padding
+        scanlines.append((b'\0' + int(bits, 2).to_bytes(row_bytes, 'big')) * box_size)
+    scanlines.append(quiet_rows)
+
+    # Only the image data chunk differs between renders of the same size
+    return prefix + _png_chunk(b'IDAT', zlib.compress(b''.join(scanlines), 1)) + _PNG_SUFFIX
+
+
+def _validate_metadata(test_id, description, labels):
+    """Validate metadata fields, raising ValueError for the first invalid one."""
+    for field, validator, value in (
+        ("test_id", validate_test_id, test_id),
+        ("description", validate_description, description),
+        ("labels", validate_labels, labels),
+    ):
+        valid, error = validator(value)
+        if not valid:
+            raise ValueError(f"Invalid {field}: {error}")
+
+
+def _encode_qr(data, mask=None):
+    """Encode data as the smallest regular QR code at error level L.
+
+    mask pins the data mask pattern (0-7) instead of scoring all eight,
+    which makes encoding several times faster; None keeps automatic choice.
+    """
+    # Imported on first use: segno's writers pull in urllib/xml (~30 ms),
+    # which --help and validator-only callers don't need
+    try:
+        import segno
+    except ImportError:
+        raise SystemExit("Error: segno library not found. Install with: pip install segno")
+    return segno.make(data, error='L', mask=mask, micro=False, boost_error=False)
+
+
+def generate_qr_code(test_id, description, labels, output_path=None, show=True, verbose=None, mask=None):
     """
     Generate QR code with test metadata.
 
@@ -157,61 +320,53 @@ def generate_qr_code(test_id, description, labels, output_path=None, show=True):
         labels: List of label strings (1-10 labels, each 1-32 chars)
         output_path: Optional path to save QR code image
         show: If True, display QR code in terminal
+        verbose: If True, print the JSON payload for verification (default: show)
+        mask: Optional fixed QR mask pattern 0-7 (default: best-scoring mask)
 
     Returns:
         JSON string of metadata
     """
     # Validate inputs
-    valid, error = validate_test_id(test_id)
-    if not valid:
-        raise ValueError(f"Invalid test_id: {error}")
-
-    valid, error = validate_description(description)
-    if not valid:
-        raise ValueError(f"Invalid description: {error}")
-
-    valid, error = validate_labels(labels)
-    if not valid:
-        raise ValueError(f"Invalid labels: {error}")
+    _validate_metadata(test_id, description, labels)
 
-    # Build JSON metadata
-    metadata = {
-        "test_id": test_id,
-        "description": description,
-        "labels": labels
-    }
-
-    json_str = json.dumps(metadata, separators=(',', ':'))  # Compact JSON
+    # Build JSON metadata (compact); test_id is validated ASCII alphanumeric,
+    # so it needs no escaping
+    json_str = (
+        f'{{"test_id":"{test_id}","description":{_json_str(description)},'
+        f'"labels":[{",".join(map(_json_str, labels))}]}}'
+    )
 
     # Generate QR code
-    qr = qrcode.QRCode(
-        version=1,  # Auto-fit
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(json_str)
-    qr.make(fit=True)
+    qr = _encode_qr(json_str, mask=mask)
 
-    # Display in terminal if requested
-    if show:
+    # Display in terminal if requested (skip when output is piped/redirected)
+    if show and sys.stdout.isatty():
         print("\nQR Code (scan with M3 Data Logger):")
-        qr.print_ascii(invert=True)
+        print(_terminal_qr(qr.matrix))
 
     # Save to file if path provided
     if output_path:
-        img = qr.make_image(fill_color="black", back_color="white")
-        img.save(output_path)
+        # Black/white renders as a 1-bit image; fast deflate is plenty for it
+        with open(output_path, 'wb') as f:
+            f.write(matrix_to_png(qr.matrix))
         print(f"\n✓ QR code saved to: {output_path}")
 
     # Print metadata for verification
-    print(f"\nMetadata JSON ({len(json_str)} bytes):")
-    print(json.dumps(metadata, indent=2))
+    if verbose is None:
+        verbose = show
+    if verbose:
+        # Same layout as json.dumps(metadata, indent=2); labels is never empty
+        labels_block = ',\n    '.join(map(_json_str, labels))
+        print(f"\nMetadata JSON ({len(json_str)} bytes):")
+        print(
+            f'{{\n  "test_id": "{test_id}",\n  "description": {_json_str(description)},\n'
+            f'  "labels": [\n    {labels_block}\n  ]\n}}'
+        )
 
     return json_str
 
 
-def generate_config_qr(wifi_ssid, wifi_password, mqtt_host, mqtt_port, mqtt_username, mqtt_password, device_id, output_path=None, show=True):
+def generate_config_qr(wifi_ssid, wifi_password, mqtt_host, mqtt_port, mqtt_username, mqtt_password, device_id, output_path=None, show=True, verbose=None, mask=None):
     """
     Generate device configuration QR code.
 
@@ -225,6 +380,8 @@ def generate_config_qr(wifi_ssid, wifi_password, mqtt_host, mqtt_port, mqtt_user
         device_id: Device identifier string (max 16 chars)
         output_path: Optional path to save QR code image
         show: If True, display QR code in terminal
+        verbose: If True, print the JSON payload for verification (default: show)
+        mask: Optional fixed QR mask pattern 0-7 (default: best-scoring mask)
 
     Returns:
         JSON string of configuration data
@@ -261,24 +418,14 @@ def generate_config_qr(wifi_ssid, wifi_password, mqtt_host, mqtt_port, mqtt_user
     if not valid:
         raise ValueError(f"Invalid device ID: {error}")
 
-    # Build JSON configuration
-    config_data = {
-        "type": "device_config",
-        "version": "1.0",
-        "wifi": {
-            "ssid": wifi_ssid,
-            "password": wifi_password
-        },
-        "mqtt": {
-            "host": mqtt_host,
-            "port": mqtt_port,
-            "username": mqtt_username,
-            "password": mqtt_password,
-            "device_id": device_id
-        }
-    }
-
-    json_str = json.dumps(config_data, separators=(',', ':'))  # Compact JSON
+    # Build JSON configuration (compact)
+    json_str = (
+        f'{{"type":"device_config","version":"1.0",'
+        f'"wifi":{{"ssid":{_json_str(wifi_ssid)},"password":{_json_str(wifi_password)}}},'
+        f'"mqtt":{{"host":{_json_str(mqtt_host)},"port":{mqtt_port:d},'
+        f'"username":{_json_str(mqtt_username)},"password":{_json_str(mqtt_password)},'
+        f'"device_id":{_json_str(device_id)}}}}}'
+    )
     json_size = len(json_str)
 
     # Check total size against Tiny Code Reader limit
@@ -299,38 +446,138 @@ def generate_config_qr(wifi_ssid, wifi_password, mqtt_host, mqtt_port, mqtt_user
         )
 
     # Generate QR code
-    qr = qrcode.QRCode(
-        version=1,  # Auto-fit
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(json_str)
-    qr.make(fit=True)
+    qr = _encode_qr(json_str, mask=mask)
 
-    # Display in terminal if requested
-    if show:
+    # Display in terminal if requested (skip when output is piped/redirected)
+    if show and sys.stdout.isatty():
         print("\nConfiguration QR Code (scan with M3 Data Logger):")
-        qr.print_ascii(invert=True)
+        print(_terminal_qr(qr.matrix))
 
     # Save to file if path provided
     if output_path:
-        img = qr.make_image(fill_color="black", back_color="white")
-        img.save(output_path)
+        # Black/white renders as a 1-bit image; fast deflate is plenty for it
+        with open(output_path, 'wb') as f:
+            f.write(matrix_to_png(qr.matrix))
         print(f"\n✓ Config QR code saved to: {output_path}")
 
     # Print configuration for verification (mask passwords)
-    config_display = config_data.copy()
-    config_display["wifi"]["password"] = "********"
-    if config_display["mqtt"]["password"]:
-        config_display["mqtt"]["password"] = "********"
+    if verbose is None:
+        verbose = show
+    if verbose:
+        config_display = {
+            "type": "device_config",
+            "version": "1.0",
+            "wifi": {
+                "ssid": wifi_ssid,
+                "password": "********"
+            },
+            "mqtt": {
+                "host": mqtt_host,
+                "port": mqtt_port,
+                "username": mqtt_username,
+                "password": "********" if mqtt_password else "",
+                "device_id": device_id
+            }
+        }
 
-    print(f"\nConfiguration JSON ({len(json_str)} bytes):")
-    print(json.dumps(config_display, indent=2))
+        print(f"\nConfiguration JSON ({len(json_str)} bytes):")
+        print(json.dumps(config_display, indent=2))
 
     return json_str
 
 
+def _generate_entry(entry, mask=None):
+    """Process-pool task for generate_many (must be a top-level function)."""
+    test_id, description, labels, output_path = entry
+    return generate_qr_code(test_id, description, labels, output_path, show=False, mask=mask)
+
+
+def generate_many(entries, show=False, workers=None, mask=None):
+    """
+    Generate metadata QR codes in bulk.
+
+    Encoding and PNG writing are CPU-bound, so entries are spread across
+    worker processes. Showing QR codes runs serially to keep terminal output
+    in order.
+
+    Args:
+        entries: Iterable of (test_id, description, labels, output_path) tuples
+        show: If True, display each QR code in terminal
+        workers: Number of worker processes (default: CPU count, 1 = in-process)
+        mask: Optional fixed QR mask pattern 0-7 (default: best-scoring mask)
+
+    Returns:
+        List of JSON strings of metadata, in input order
+    """
+    entries = list(entries)
+    workers = workers or os.cpu_count() or 1
+    if show or workers == 1 or len(entries) < 2:
+        return [
+            generate_qr_code(test_id, description, labels, output_path, show=show, mask=mask)
+            for test_id, description, labels, output_path in entries
+        ]
+
+    # Imported here: concurrent.futures.process pulls in multiprocessing
+    # (~17 ms), which single-code runs and validator-only imports don't need
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(entries) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        task = functools.partial(_generate_entry, mask=mask)
+        return list(pool.map(task, entries, chunksize=chunksize))
+
+
+def read_batch_file(path):
+    """
+    Read metadata entries for generate_many from a JSONL file.
+
+    Each non-blank line is an object with "description" and "labels", plus
+    optional "test_id" (auto-generated if missing) and "output" (default:
+    <test_id>_qr.png).
+
+    Returns:
+        List of (test_id, description, labels, output_path) tuples
+
+    Raises:
+        ValueError: "<path>:<line>: ..." for the first malformed or invalid entry
+    """
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entries.append(_parse_batch_entry(line))
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_no}: {e}") from None
+    return entries
+
+
+def _parse_batch_entry(line):
+    """Parse and validate one JSONL batch line, raising ValueError if invalid."""
+    try:
+        entry = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"invalid JSON ({e})") from None
+    if not isinstance(entry, dict):
+        raise ValueError("entry must be a JSON object")
+    for key in ("description", "labels"):
+        if key not in entry:
+            raise ValueError(f"missing \"{key}\"")
+
+    # A bare string would pass validate_labels as a list of 1-char labels
+    labels = entry["labels"]
+    if not (isinstance(labels, list) and all(isinstance(label, str) for label in labels)):
+        raise ValueError('"labels" must be a list of strings')
+    for key in ("description", "test_id", "output"):
+        if key in entry and not isinstance(entry[key], str):
+            raise ValueError(f'"{key}" must be a string')
+
+    test_id = entry.get("test_id") or generate_short_uuid()
+    _validate_metadata(test_id, entry["description"], labels)
+    return test_id, entry["description"], labels, entry.get("output") or f"{test_id}_qr.png"
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate QR codes for M3 Data Logger (metadata or device configuration)",
@@ -346,6 +593,10 @@ Examples - Metadata Mode:
   # Save to file
   python generate_qr.py --mode metadata --description "test1" --labels demo --output test1_qr.png
 
+  # Generate many QR codes in one run from a JSONL file, one object per line:
+  #   {"description": "test1", "labels": ["demo"], "output": "test1_qr.png"}
+  python generate_qr.py --mode metadata --batch tests.jsonl
+
 Examples - Config Mode:
   # Generate device configuration QR
   python generate_qr.py --mode config \\
@@ -373,6 +624,8 @@ Examples - Config Mode:
     parser.add_argument('--test-id', type=str, help='[metadata] 8-character alphanumeric test ID (optional, auto-generated if not provided)')
     parser.add_argument('--description', type=str, help='[metadata] Test description (1-64 chars)')
     parser.add_argument('--labels', nargs='+', help='[metadata] Labels (1-10 labels, each 1-32 chars)')
+    parser.add_argument('--batch', type=str, metavar='FILE',
+                        help='[metadata] JSONL file of entries to generate in one run (not combinable with --test-id/--description/--labels/--output)')
 
     # Config mode arguments
     parser.add_argument('--wifi-ssid', type=str, help='[config] WiFi SSID (1-32 chars)')
@@ -385,12 +638,29 @@ Examples - Config Mode:
 
     # Common arguments
     parser.add_argument('--output', '-o', type=str, help='Output PNG file path')
-    parser.add_argument('--no-show', action='store_true', help='Do not display QR in terminal')
+    parser.add_argument('--mask', type=int, choices=range(8), metavar='0-7',
+                        help='Use a fixed QR mask pattern instead of scoring all 8 (faster; default: auto)')
+    parser.add_argument('--no-show', action='store_true',
+                        help='Do not display QR or payload JSON in terminal '
+                             '(the QR preview is only drawn when stdout is a terminal)')
 
     args = parser.parse_args()
 
     try:
-        if args.mode == 'metadata':
+        if args.batch:
+            # --batch entries carry their own fields; don't silently drop these
+            if args.mode != 'metadata':
+                parser.error("--batch is only supported with --mode metadata")
+            conflicting = [flag for flag, value in (
+                ('--test-id', args.test_id), ('--description', args.description),
+                ('--labels', args.labels), ('--output', args.output),
+            ) if value]
+            if conflicting:
+                parser.error(f"--batch cannot be combined with {', '.join(conflicting)}")
+            results = generate_many(read_batch_file(args.batch), mask=args.mask)
+            print(f"\n✓ Generated {len(results)} QR codes from {args.batch}")
+
+        elif args.mode == 'metadata':
             # Validate required metadata arguments
             if not args.description:
                 parser.error("Metadata mode requires --description")
@@ -409,7 +679,9 @@ Examples - Config Mode:
                 description=args.description,
                 labels=args.labels,
                 output_path=args.output,
-                show=not args.no_show
+                show=not args.no_show,
+                verbose=not args.no_show,
+                mask=args.mask
             )
 
         elif args.mode == 'config':
@@ -428,7 +700,9 @@ Examples - Config Mode:
                 mqtt_password=args.mqtt_password,
                 device_id=args.device_id,
                 output_path=args.output,
-                show=not args.no_show
+                show=not args.no_show,
+                verbose=not args.no_show,
+                mask=args.mask
             )
 
     except ValueError as e:
@@ -0,0 +1,188 @@
+"""
+Equivalence tests for the hand-rolled fast paths in generate_qr.py.
+
+Each fast path replaces a library call (segno's PNG/terminal writers,
+json.dumps, re.match) with a hand-written version. These tests compare
+them against the originals so the two cannot silently diverge.
+
+Run from tools/qr_generator:
+    pip install pytest
+    python -m pytest -q
+"""
+
+import io
+import json
+import random
+import re
+import string
+import zlib
+
+import pytest
+
+import generate_qr
+
+segno = pytest.importorskip("segno")
+
+# Fixed seed so failures reproduce
+SEED = 20240601
+
+# Characters that exercise JSON escaping: quotes, backslashes, control
+# characters, non-ASCII and astral-plane (surrogate pair) code points
+TRICKY_CHARS = string.printable + '"\\\x00\x1f\x7fé 中\U0001f600'
+
+
+def _random_text(rng, alphabet, min_len, max_len):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(min_len, max_len)))
+
+
+# PNG greyscale bit -> module value (bit 1 = white = light module)
+_BYTE_BITS = [format(value, '08b').encode('ascii') for value in range(256)]
+_BITS_TO_MODULES = bytes.maketrans(b'01', b'\x01\x00')
+
+
+@pytest.fixture(scope='module')
+def symbols():
+    """One symbol per QR version (1-40), error level L as _encode_qr uses."""
+    return [
+        segno.make('M3', error='L', version=version, mask=0, micro=False, boost_error=False)
+        for version in range(1, 41)
+    ]
+
+
+def _decode_png(png):
+    """Decode a 1-bit greyscale PNG to rows of 0/1 pixel bytes (1 = dark)."""
+    assert png.startswith(generate_qr.PNG_SIGNATURE)
+    pos = len(generate_qr.PNG_SIGNATURE)
+    idat = b''
+    while pos < len(png):
+        length = int.from_bytes(png[pos:pos + 4], 'big')
+        tag = png[pos + 4:pos + 8]
+        data = png[pos + 8:pos + 8 + length]
+        if tag == b'IHDR':
+            width, height = int.from_bytes(data[0:4], 'big'), int.from_bytes(data[4:8], 'big')
+            assert data[8:] == b'\x01\x00\x00\x00\x00'
+        elif tag == b'IDAT':
+            idat += data
+        pos += 12 + length
+
+    raw = zlib.decompress(idat)
+    row_bytes = (width + 7) // 8
+    rows = []
+    for y in range(height):
+        line = raw[y * (row_bytes + 1):(y + 1) * (row_bytes + 1)]
+        assert line[0] == 0  # filter type None
+        bits = b''.join(map(_BYTE_BITS.__getitem__, line[1:]))[:width]
+        rows.append(bits.translate(_BITS_TO_MODULES))
+    return rows
+
+
+def test_short_uuid_alphabet():
+    assert set(generate_qr._SUUID_ALPHABET) == set(string.ascii_uppercase + string.digits) - set('01IOl')
+    assert len(generate_qr._SUUID_ALPHABET) == 32  # 256 byte values map evenly
+
+
+def test_short_uuid_format():
+    for _ in range(100):
+        test_id = generate_qr.generate_short_uuid()
+        assert len(test_id) == 8
+        assert set(test_id) <= set(generate_qr._SUUID_ALPHABET)
+
+
+def test_matrix_to_png_matches_segno_pixels(symbols):
+    for qr in symbols:
+        expected = [
+            bytes(row)
+            for row in qr.matrix_iter(scale=generate_qr.QR_BOX_SIZE, border=generate_qr.QR_BORDER)
+        ]
+        assert _decode_png(generate_qr.matrix_to_png(qr.matrix)) == expected, qr.version
+
+
+def test_matrix_to_png_matches_segno_png(symbols):
+    Image = pytest.importorskip("PIL.Image")
+    for qr in symbols:
+        out = io.BytesIO()
+        qr.save(out, kind='png', scale=generate_qr.QR_BOX_SIZE, border=generate_qr.QR_BORDER)
+        ours = Image.open(io.BytesIO(generate_qr.matrix_to_png(qr.matrix))).convert('L')
+        theirs = Image.open(io.BytesIO(out.getvalue())).convert('L')
+        assert ours.size == theirs.size, qr.version
+        assert ours.tobytes() == theirs.tobytes(), qr.version
+
+
+def test_terminal_qr_matches_segno_compact(symbols):
+    for qr in symbols:
+        out = io.StringIO()
+        qr.terminal(out=out, compact=True, border=generate_qr.QR_BORDER)
+        assert generate_qr._terminal_qr(qr.matrix) + '\n' == out.getvalue(), qr.version
+
+
+def test_metadata_payload_matches_json_dumps(monkeypatch, capsys):
+    monkeypatch.setattr(generate_qr, '_encode_qr', lambda data, mask=None: None)
+    rng = random.Random(SEED)
+    for _ in range(500):
+        test_id = _random_text(rng, string.ascii_letters + string.digits, 8, 8)
+        description = _random_text(rng, TRICKY_CHARS, 1, 64)
+        labels = [_random_text(rng, TRICKY_CHARS, 1, 32) for _ in range(rng.randint(1, 10))]
+        metadata = {"test_id": test_id, "description": description, "labels": labels}
+
+        json_str = generate_qr.generate_qr_code(test_id, description, labels, show=False, verbose=True)
+
+        assert json_str == json.dumps(metadata, separators=(',', ':'))
+        printed = capsys.readouterr().out
+        assert printed == f"\nMetadata JSON ({len(json_str)} bytes):\n{json.dumps(metadata, indent=2)}\n"
+
+
+def test_config_payload_matches_json_dumps(monkeypatch):
+    monkeypatch.setattr(generate_qr, '_encode_qr', lambda data, mask=None: None)
+    rng = random.Random(SEED)
+    printable = ''.join(map(chr, range(0x20, 0x7F)))
+    host_chars = string.ascii_lowercase + string.digits
+    for _ in range(500):
+        config = {
+            "type": "device_config",
+            "version": "1.0",
+            "wifi": {
+                "ssid": _random_text(rng, printable, 1, generate_qr.WIFI_SSID_MAX_LEN),
+                "password": _random_text(rng, printable, 8, generate_qr.WIFI_PASSWORD_MAX_LEN),
+            },
+            "mqtt": {
+                "host": '.'.join(_random_text(rng, host_chars, 1, 8) for _ in range(rng.randint(1, 3))),
+                "port": rng.randint(1, 65535),
+                "username": _random_text(rng, TRICKY_CHARS, 0, generate_qr.MQTT_USERNAME_MAX_LEN),
+                "password": _random_text(rng, TRICKY_CHARS, 0, generate_qr.MQTT_PASSWORD_MAX_LEN),
+                "device_id": _random_text(rng, TRICKY_CHARS, 1, generate_qr.DEVICE_ID_MAX_LEN),
+            },
+        }
+        wifi, mqtt = config["wifi"], config["mqtt"]
+        expected = json.dumps(config, separators=(',', ':'))
+        if len(expected) > generate_qr.QR_MAX_PAYLOAD_BYTES:
+            continue  # over the payload limit, so rejected before encoding
+
+        json_str = generate_qr.generate_config_qr(
+            wifi["ssid"], wifi["password"], mqtt["host"], mqtt["port"],
+            mqtt["username"], mqtt["password"], mqtt["device_id"], show=False, verbose=False,
+        )
+
+        assert json_str == expected
+
+
+def test_valid_dns_matches_pattern():
+    rng = random.Random(SEED)
+    alphabet = string.ascii_letters + string.digits + '-.._é '
+    hosts = [_random_text(rng, alphabet, 0, 20) for _ in range(20000)]
+    hosts += [
+        '', '.', 'a.', '.a', 'a..b', '-a', 'a-', 'a-b', '192.168.1.1', '256.1.1.1',
+        'mqtt.example.com', 'a' * 63, 'a' * 64, 'b.' + 'a' * 63, 'b.' + 'a' * 64, 'a²',
+    ]
+    for host in hosts:
+        expected = re.match(generate_qr.DNS_HOST_PATTERN, host) is not None
+        assert generate_qr._valid_dns(host) is expected, repr(host)
+
+
+def test_validate_test_id_matches_pattern():
+    rng = random.Random(SEED)
+    alphabet = string.ascii_letters + string.digits + ' -_\n²é'
+    test_ids = [_random_text(rng, alphabet, 6, 10) for _ in range(20000)]
+    test_ids += ['A3F9K2M7', 'a3f9k2m7', 'A3F9K2M', 'A3F9K2M7X', 'A3F9K2M7\n', 'A3F9K2M²', '']
+    for test_id in test_ids:
+        expected = re.fullmatch(generate_qr.TEST_ID_PATTERN, test_id) is not None
+        assert generate_qr.validate_test_id(test_id)[0] is expected, repr(test_id)